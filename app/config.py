@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -9,12 +10,20 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_key: str
     supabase_service_key: str
+    supabase_db_url: str
     
     # JWT Configuration
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Password Hashing Configuration (argon2)
+    argon2_time_cost: int = 2
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 1
+    # When set, raise argon2_time_cost at startup until one hash takes this long
+    password_hash_target_ms: Optional[int] = None
+    
     # Google Gemini Configuration
     google_api_key: str
     
@@ -1,43 +1,24 @@
+import asyncpg
 from fastapi import HTTPException, status
 from app.schemas.user import UserRegisterRequest, UserResponse
-from app.utils.auth import hash_password
-from app.database import supabase_admin
+from app.utils.auth import hash_password_async
+from app.database import get_pg_pool
+from app.models.user import USER_RESPONSE_COLUMNS
+from app.controllers.user_controller import invalidate_teacher_cache
+
+# Raised by the trigger in migration 007 when teacher_id is not a teacher
+TEACHER_ROLE_CONSTRAINT = "teacher_must_be_teacher"
 
 
 async def register_user(user_data: UserRegisterRequest) -> UserResponse:
     """Controller for user registration"""
-    # Check if user already exists
-    existing_user = supabase_admin.table("users").select("*").eq("email", user_data.email).execute()
-    
-    if existing_user.data:
+    # Validate teacher_id for students
+    if user_data.role == "student" and not user_data.teacher_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+            detail="Students must be associated with a teacher (teacher_id required)"
         )
     
-    # Validate teacher_id for students
-    if user_data.role == "student":
-        if not user_data.teacher_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Students must be associated with a teacher (teacher_id required)"
-            )
-        
-        # Verify the teacher exists and is actually a teacher
-        teacher = supabase_admin.table("users").select("id, role").eq("id", user_data.teacher_id).execute()
-        
-        if not teacher.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Teacher not found"
-            )
-        
-        if teacher.data[0]["role"] != "teacher":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="The provided user is not a teacher"
-            )
-    
     # Teachers should not have a teacher_id
     if user_data.role == "teacher" and user_data.teacher_id:
         raise HTTPException(
@@ -45,8 +26,8 @@ async def register_user(user_data: UserRegisterRequest) -> UserResponse:
             detail="Teachers cannot be associated with another teacher"
         )
     
-    # Hash the password
-    hashed_password = hash_password(user_data.password)
+    # Hash the password (CPU-bound, so keep it off the event loop)
+    hashed_password = await hash_password_async(user_data.password)
     
     # Prepare user data for insertion
     user_dict = {
@@ -62,28 +43,39 @@ async def register_user(user_data: UserRegisterRequest) -> UserResponse:
         "profile_image": user_data.profile_image,
     }
     
-    # Insert user into database
-    result = supabase_admin.table("users").insert(user_dict).execute()
+    # Insert user into database in a single round-trip. An existing email
+    # hits ON CONFLICT and returns no row; the teacher_id foreign key and the
+    # teacher_must_be_teacher trigger (migration 007) validate the teacher
+    columns = ", ".join(user_dict)
+    placeholders = ", ".join(f"${i}" for i in range(1, len(user_dict) + 1))
+    try:
+        user = await get_pg_pool().fetchrow(
+            f"INSERT INTO users ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT (email) DO NOTHING RETURNING {USER_RESPONSE_COLUMNS}",
+            *user_dict.values()
+        )
+    except asyncpg.ForeignKeyViolationError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Teacher not found"
+        )
+    except asyncpg.CheckViolationError as e:
+        if e.constraint_name != TEACHER_ROLE_CONSTRAINT:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The provided user is not a teacher"
+        )
     
-    if not result.data:
+    if not user:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to create user"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
         )
     
+    # New teachers must show up in the teacher list right away
+    if user_data.role == "teacher":
+        invalidate_teacher_cache()
+    
     # Return user data (without password hash)
-    user = result.data[0]
-    return UserResponse(
-        id=user["id"],
-        email=user["email"],
-        first_name=user["first_name"],
-        last_name=user["last_name"],
-        role=user["role"],
-        teacher_id=user.get("teacher_id"),
-        age=user["age"],
-        gender=user["gender"],
-        organization=user["organization"],
-        profile_image=user["profile_image"],
-        is_active=user["is_active"],
-        is_verified=user["is_verified"]
-    )
+    return UserResponse.from_row(user)
@@ -1,34 +1,61 @@
-from fastapi import HTTPException, status
+from fastapi import BackgroundTasks, HTTPException, status
 from typing import Dict
 from app.schemas.user import UserLoginRequest, UserResponse, LoginResponse
-from app.utils.auth import verify_password, create_access_token
-from app.database import supabase_admin
+from app.utils.auth import verify_and_update_password_async, create_access_token
+from app.database import get_pg_pool
+from app.models.user import USER_RESPONSE_COLUMNS
+from app.utils.event_buffer import record_login_event, record_reset_token
 from datetime import timedelta
 from app.config import get_settings
 
 settings = get_settings()
 
+# Token lifetimes are fixed by configuration, so build them once
+ACCESS_TOKEN_TTL = timedelta(minutes=settings.access_token_expire_minutes)
+RESET_TOKEN_TTL_HOURS = 24
 
-async def authenticate_user(credentials: UserLoginRequest) -> LoginResponse:
+# Everything LoginResponse needs plus the hash to verify, built once at import
+_LOGIN_USER_QUERY = f"SELECT {USER_RESPONSE_COLUMNS}, password_hash FROM users WHERE email = $1 LIMIT 1"
+
+
+async def _save_password_hash(user_id: str, password_hash: str) -> None:
+    """Replace a user's stored password hash"""
+    try:
+        await get_pg_pool().execute(
+            "UPDATE users SET password_hash = $1 WHERE id = $2",
+            password_hash,
+            user_id
+        )
+    except Exception as e:
+        print(f"Failed to upgrade password hash for user {user_id}: {e}")
+
+
+async def authenticate_user(credentials: UserLoginRequest, background_tasks: BackgroundTasks) -> LoginResponse:
     """Controller for user login"""
     # Find user by email
-    result = supabase_admin.table("users").select("*").eq("email", credentials.email).execute()
+    user = await get_pg_pool().fetchrow(_LOGIN_USER_QUERY, credentials.email)
     
-    if not result.data:
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    user = result.data[0]
+    # Verify password (hashing is CPU-bound, so keep it off the event loop)
+    is_valid, new_hash = await verify_and_update_password_async(
+        credentials.password, user["password_hash"]
+    )
     
-    # Verify password
-    if not verify_password(credentials.password, user["password_hash"]):
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # Upgrade legacy bcrypt hashes to argon2 after the response is sent
+    if new_hash:
+        background_tasks.add_task(_save_password_hash, user["id"], new_hash)
+    
     # Check if user is active
     if not user["is_active"]:
         raise HTTPException(
@@ -39,67 +66,48 @@ async def authenticate_user(credentials: UserLoginRequest) -> LoginResponse:
     # Create access token
     access_token = create_access_token(
         data={"sub": user["id"], "email": user["email"]},
-        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+        expires_delta=ACCESS_TOKEN_TTL
     )
     
-    # Optional: Log login attempt
-    try:
-        supabase_admin.table("login_history").insert({
-            "user_id": user["id"],
-            "success": True
-        }).execute()
-    except:
-        pass  # Don't fail login if logging fails
+    # Optional: Log login attempt (written in batches by the event buffer)
+    record_login_event(user["id"])
     
     return LoginResponse(
         access_token=access_token,
         token_type="bearer",
-        user=UserResponse(
-            id=user["id"],
-            email=user["email"],
-            first_name=user["first_name"],
-            last_name=user["last_name"],
-            role=user["role"],
-            teacher_id=user.get("teacher_id"),
-            age=user["age"],
-            gender=user["gender"],
-            organization=user["organization"],
-            profile_image=user["profile_image"],
-            is_active=user["is_active"],
-            is_verified=user["is_verified"]
-        )
+        user=UserResponse.from_row(user)
     )
 
 
-async def request_password_reset(email: str) -> Dict[str, str]:
-    """Controller for password reset request"""
+async def _issue_reset_token(email: str) -> None:
+    """Create a password reset token for the email's user, if there is one"""
     from app.utils.token import generate_reset_token, get_token_expiry
     
-    # Find user by email
-    result = supabase_admin.table("users").select("id, email").eq("email", email).execute()
-    
-    # Don't reveal if email exists or not (security best practice)
-    if not result.data:
-        return {
-            "message": "If the email exists, a password reset link has been sent",
-            "success": True
-        }
-    
-    user = result.data[0]
-    
-    # Generate reset token
-    reset_token = generate_reset_token()
-    token_expiry = get_token_expiry(hours=24)  # Token valid for 24 hours
-    
-    # Save reset token to database
-    supabase_admin.table("password_reset_tokens").insert({
-        "user_id": user["id"],
-        "token": reset_token,
-        "expires_at": token_expiry.isoformat()
-    }).execute()
-    
-    # TODO: In production, send email with reset link containing the token
-    # Example: https://yourapp.com/reset-password?token={reset_token}
+    try:
+        # Find user by email
+        user_id = await get_pg_pool().fetchval("SELECT id FROM users WHERE email = $1", email)
+        
+        if user_id is None:
+            return
+        
+        # Generate reset token
+        reset_token = generate_reset_token()
+        token_expiry = get_token_expiry(hours=RESET_TOKEN_TTL_HOURS)
+        
+        # Save reset token to database (written in batches by the event buffer)
+        record_reset_token(user_id, reset_token, token_expiry)
+        
+        # TODO: In production, send email with reset link containing the token
+        # Example: https://yourapp.com/reset-password?token={reset_token}
+    except Exception as e:
+        print(f"Failed to issue password reset token: {e}")
+
+
+async def request_password_reset(email: str, background_tasks: BackgroundTasks) -> Dict[str, str]:
+    """Controller for password reset request"""
+    # Don't reveal if email exists or not (security best practice): the lookup
+    # runs after the response, so every request answers in the same time
+    background_tasks.add_task(_issue_reset_token, email)
     
     return {
         "message": "If the email exists, a password reset link has been sent",
@@ -110,14 +118,8 @@ async def request_password_reset(email: str) -> Dict[str, str]:
 async def logout_user(user_id: str) -> Dict[str, str]:
     """Controller for user logout"""
     # Log the logout event (optional)
-    try:
-        supabase_admin.table("login_history").insert({
-            "user_id": user_id,
-            "success": True,
-            # You could add a logout flag or separate logout table if needed
-        }).execute()
-    except:
-        pass  # Don't fail logout if logging fails
+    # You could add a logout flag or separate logout table if needed
+    record_login_event(user_id)
     
     # With JWT tokens, logout is handled client-side by removing the token
     # Server-side logout would require a token blacklist/revocation system
@@ -1,14 +1,10 @@
-import os
-import base64
+import asyncio
 import json
-import time
-from typing import List
-from io import BytesIO
+from typing import BinaryIO, List, Union
 from PIL import Image
 import google.generativeai as genai
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from fastapi import UploadFile, HTTPException, status
 from app.config import get_settings
 from app.schemas.question import Question, QuestionGenerationResponse
@@ -18,53 +14,132 @@ settings = get_settings()
 # Configure Gemini
 genai.configure(api_key=settings.google_api_key)
 
+# Maximum number of concurrent Gemini OCR requests per upload batch
+OCR_CONCURRENCY = 4
+
+# Question types used when the caller does not specify any
+DEFAULT_QUESTION_TYPES = ("multiple_choice", "short_answer", "true_false")
+
+# Upload content types accepted for OCR
+VALID_IMAGE_TYPES = frozenset({"image/jpeg", "image/jpg", "image/png", "image/webp"})
+
+# Images larger than this (in pixels, longest side) are downscaled for OCR
+MAX_IMAGE_SIZE = 1024
+
+# Formats Gemini accepts as-is, so small uploads skip decoding entirely
+_PASSTHROUGH_MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png"}
+
+# Models and prompts are built once at import and shared across requests
+_OCR_PROMPT = "Extract all text from this image. Include both Bangla and English text."
+
+_VISION_MODEL = genai.GenerativeModel('gemini-2.5-flash-lite')
+
+_LLM = ChatGoogleGenerativeAI(
+    model="gemini-2.5-flash-lite",
+    google_api_key=settings.google_api_key,
+    temperature=0.7,
+    convert_system_message_to_human=True
+)
+
+_QUESTION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert educator creating educational questions.
+    Generate questions based on the provided content for the subject: {subject}.
+    The content may be in Bangla (Bengali) or English.
+    
+    Generate {num_questions} questions with the following specifications:
+    - Difficulty level: {difficulty}
+    - Question types: {question_types}
+    - Mix different question types if multiple types are requested
+    - For multiple choice questions, provide 4 options labeled A, B, C, D
+    - Always include the correct answer
+    - Ensure questions are clear, educational, and test understanding of the content
+    
+    Return the response as a valid JSON array of question objects with this structure:
+    [
+        {{
+            "question": "Question text here?",
+            "question_type": "multiple_choice|short_answer|true_false",
+            "options": ["A. Option 1", "B. Option 2", "C. Option 3", "D. Option 4"] (only for multiple_choice),
+            "correct_answer": "Correct answer here",
+            "difficulty": "{difficulty}",
+            "subject": "{subject}"
+        }}
+    ]
+    """),
+    ("user", "Content to generate questions from:\n\n{content}")
+])
+
+
+def _prepare_image(image_file: BinaryIO) -> Union[Image.Image, dict]:
+    """
+    Prepare an uploaded image for Gemini OCR
+    
+    Small JPEG/PNG uploads are passed through as raw bytes; anything else
+    is decoded and downscaled. PIL reads straight from the upload's spooled
+    file, so large uploads are never copied into memory as a whole
+    """
+    # Open image with PIL (only the header is read until pixels are needed)
+    image_file.seek(0)
+    image = Image.open(image_file)
+    
+    if max(image.size) <= MAX_IMAGE_SIZE and image.format in _PASSTHROUGH_MIME_TYPES:
+        image_file.seek(0)
+        return {"mime_type": _PASSTHROUGH_MIME_TYPES[image.format], "data": image_file.read()}
+    
+    new_size = None
+    if max(image.size) > MAX_IMAGE_SIZE:
+        ratio = MAX_IMAGE_SIZE / max(image.size)
+        new_size = tuple(int(dim * ratio) for dim in image.size)
+        # For JPEGs, let libjpeg decode straight to RGB at a reduced DCT
+        # scale (1/2, 1/4, 1/8) so the full-resolution raster is never built;
+        # this is a no-op for other formats
+        image.draft('RGB', new_size)
+    
+    # Convert to RGB if necessary
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    # Resize large images to reduce processing time
+    if new_size and image.size != new_size:
+        # reducing_gap does a cheap integer box reduction before LANCZOS,
+        # so the expensive filter only runs near the target size
+        image = image.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    
+    # Finish decoding here; the upload file is closed once the request ends
+    image.load()
+    
+    return image
+
 
 async def extract_text_from_images(images: List[UploadFile]) -> str:
     """
     Extract text from multiple images using Gemini Vision OCR
     Supports Bangla and English text
-    """
-    all_extracted_text = []
     
-    # Initialize Gemini Vision model for OCR with timeout settings
-    vision_model = genai.GenerativeModel('gemini-2.5-flash-lite')
+    Images are processed concurrently, at most OCR_CONCURRENCY at a time
+    """
+    # Bound in-flight Gemini requests to respect the API rate limits
+    semaphore = asyncio.Semaphore(OCR_CONCURRENCY)
     
-    for idx, image_file in enumerate(images):
+    async def _ocr_one(idx: int, image_file: UploadFile) -> str:
         max_retries = 3
         retry_delay = 2  # seconds
         
+        # Prepared once, then reused across retries
+        image = None
+        
         for attempt in range(max_retries):
             try:
-                # Read image content
-                image_content = await image_file.read()
-                
-                # Open image with PIL
-                image = Image.open(BytesIO(image_content))
-                
-                # Convert to RGB if necessary
-                if image.mode != 'RGB':
-                    image = image.convert('RGB')
-                
-                # Resize large images to reduce processing time
-                max_size = 1024
-                if max(image.size) > max_size:
-                    ratio = max_size / max(image.size)
-                    new_size = tuple(int(dim * ratio) for dim in image.size)
-                    image = image.resize(new_size, Image.Resampling.LANCZOS)
+                if image is None:
+                    image = await asyncio.to_thread(_prepare_image, image_file.file)
                 
-                # Extract text using Gemini Vision with simpler prompt
-                prompt = "Extract all text from this image. Include both Bangla and English text."
-                
-                response = vision_model.generate_content([prompt, image])
+                # Extract text using Gemini Vision
+                # The Gemini SDK is synchronous, so run it in a worker thread
+                async with semaphore:
+                    response = await asyncio.to_thread(_VISION_MODEL.generate_content, [_OCR_PROMPT, image])
                 extracted_text = response.text
                 
-                all_extracted_text.append(f"--- Image {idx + 1} ---\n{extracted_text}\n")
-                
-                # Reset file pointer for potential reuse
-                await image_file.seek(0)
-                
-                # Success - break retry loop
-                break
+                return f"--- Image {idx + 1} ---\n{extracted_text}\n"
                 
             except Exception as e:
                 error_msg = str(e)
@@ -72,8 +147,7 @@ async def extract_text_from_images(images: List[UploadFile]) -> str:
                 # If timeout or 504, retry
                 if ("timeout" in error_msg.lower() or "504" in error_msg) and attempt < max_retries - 1:
                     print(f"Attempt {attempt + 1} failed for image {idx + 1}, retrying in {retry_delay}s...")
-                    time.sleep(retry_delay)
-                    await image_file.seek(0)  # Reset file pointer for retry
+                    await asyncio.sleep(retry_delay)
                     continue
                 
                 # Final failure after retries
@@ -82,7 +156,78 @@ async def extract_text_from_images(images: List[UploadFile]) -> str:
                     detail=f"Error extracting text from image {idx + 1} after {max_retries} attempts: {error_msg}"
                 )
     
-    return "\n".join(all_extracted_text)
+    tasks = [asyncio.create_task(_ocr_one(idx, image_file)) for idx, image_file in enumerate(images)]
+    try:
+        # Stop at the first image that fails for good, like the sequential version
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        # Cancel the rest so they don't keep retrying against Gemini
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    for task in tasks:
+        if task in done and task.exception() is not None:
+            raise task.exception()
+    
+    # tasks are in input order, so results line up with the images
+    return "\n".join(task.result() for task in tasks)
+
+
+class _JsonArrayStream:
+    """
+    Incrementally decode the objects of a JSON array from streamed text
+    
+    Text before the opening '[' is skipped, and each element is decoded as
+    soon as it is complete, so parsing overlaps with generation
+    """
+    
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self.started = False
+        self.finished = False
+    
+    def feed(self, text: str) -> List[dict]:
+        """Add a chunk of text and return the elements completed by it"""
+        if self.finished:
+            return []
+        
+        self._buffer += text
+        
+        if not self.started:
+            start_idx = self._buffer.find('[')
+            if start_idx == -1:
+                return []
+            self._buffer = self._buffer[start_idx + 1:]
+            self.started = True
+        
+        items = []
+        while True:
+            buffer = self._buffer.lstrip(" \t\r\n,")
+            if buffer.startswith(']'):
+                self.finished = True
+                self._buffer = ""
+                break
+            try:
+                item, end_idx = self._decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # Element not complete yet; wait for more text
+                self._buffer = buffer
+                break
+            items.append(item)
+            self._buffer = buffer[end_idx:]
+        
+        return items
+    
+    def close(self) -> None:
+        """Raise JSONDecodeError if the stream ended inside the array"""
+        if self.started and not self.finished:
+            buffer = self._buffer.lstrip(" \t\r\n,")
+            if buffer:
+                # Surface the decoder's own error for the trailing element
+                self._decoder.raw_decode(buffer)
+            raise json.JSONDecodeError("Unterminated JSON array", buffer, len(buffer))
 
 
 async def generate_questions_from_content(
@@ -96,48 +241,11 @@ async def generate_questions_from_content(
     Generate questions from extracted content using Gemini LLM
     """
     if question_types is None:
-        question_types = ["multiple_choice", "short_answer", "true_false"]
+        question_types = DEFAULT_QUESTION_TYPES
     
     try:
-        # Initialize Gemini LLM
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash-lite",
-            google_api_key=settings.google_api_key,
-            temperature=0.7,
-            convert_system_message_to_human=True
-        )
-        
-        # Create prompt template
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert educator creating educational questions.
-            Generate questions based on the provided content for the subject: {subject}.
-            The content may be in Bangla (Bengali) or English.
-            
-            Generate {num_questions} questions with the following specifications:
-            - Difficulty level: {difficulty}
-            - Question types: {question_types}
-            - Mix different question types if multiple types are requested
-            - For multiple choice questions, provide 4 options labeled A, B, C, D
-            - Always include the correct answer
-            - Ensure questions are clear, educational, and test understanding of the content
-            
-            Return the response as a valid JSON array of question objects with this structure:
-            [
-                {{
-                    "question": "Question text here?",
-                    "question_type": "multiple_choice|short_answer|true_false",
-                    "options": ["A. Option 1", "B. Option 2", "C. Option 3", "D. Option 4"] (only for multiple_choice),
-                    "correct_answer": "Correct answer here",
-                    "difficulty": "{difficulty}",
-                    "subject": "{subject}"
-                }}
-            ]
-            """),
-            ("user", "Content to generate questions from:\n\n{content}")
-        ])
-        
         # Format the prompt
-        messages = prompt_template.format_messages(
+        messages = _QUESTION_PROMPT.format_messages(
             subject=subject,
             num_questions=num_questions,
             difficulty=difficulty,
@@ -145,14 +253,21 @@ async def generate_questions_from_content(
             content=content[:8000]  # Limit content length to avoid token limits
         )
         
-        # Generate questions
-        response = llm.invoke(messages)
+        # Generate questions, parsing each one as soon as it is streamed
+        array_stream = _JsonArrayStream()
+        questions = []
+        response_text = ""  # First 500 chars, kept for logging and errors
+        
+        async for chunk in _LLM.astream(messages):
+            if len(response_text) < 500:
+                response_text = (response_text + chunk.content)[:500]
+            for q in array_stream.feed(chunk.content):
+                questions.append(Question(**q))
         
-        # Extract JSON from response
-        response_text = response.content.strip()
+        response_text = response_text.strip()
         
         # Log response for debugging
-        print(f"LLM Response: {response_text[:500]}...")  # Print first 500 chars
+        print(f"LLM Response: {response_text}...")  # Print first 500 chars
         
         if not response_text:
             raise HTTPException(
@@ -160,22 +275,14 @@ async def generate_questions_from_content(
                 detail="LLM returned an empty response"
             )
         
-        # Try to find JSON array in the response
-        start_idx = response_text.find('[')
-        end_idx = response_text.rfind(']') + 1
-        
-        if start_idx != -1 and end_idx != 0:
-            json_str = response_text[start_idx:end_idx]
-            questions_data = json.loads(json_str)
-        else:
+        if not array_stream.started:
             # If no JSON array found, raise error with response preview
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Could not find JSON array in response. Response preview: {response_text[:200]}"
             )
         
-        # Convert to Question objects
-        questions = [Question(**q) for q in questions_data]
+        array_stream.close()
         
         # Create preview of extracted text
         text_preview = content[:500] + "..." if len(content) > 500 else content
@@ -218,9 +325,8 @@ async def process_images_and_generate_questions(
         )
     
     # Validate image types
-    valid_types = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
     for image in images:
-        if image.content_type not in valid_types:
+        if image.content_type not in VALID_IMAGE_TYPES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid file type: {image.content_type}. Allowed types: jpeg, jpg, png, webp"
@@ -1,74 +1,89 @@
 from fastapi import HTTPException, status
 from typing import List
+from cachetools import TTLCache
 from app.schemas.user import UserResponse, TeacherListResponse
-from app.database import supabase_admin
+from app.database import get_pg_pool
+from app.models.user import USER_RESPONSE_COLUMNS
 
+# The teacher list changes rarely, so serve it from memory for a short while
+TEACHER_CACHE_TTL_SECONDS = 30
+_teacher_cache: TTLCache = TTLCache(maxsize=64, ttl=TEACHER_CACHE_TTL_SECONDS)
 
-async def get_all_teachers() -> TeacherListResponse:
-    """Controller to get all teachers"""
-    # Query all teachers from database
-    result = supabase_admin.table("users").select("*").eq("role", "teacher").execute()
+# Bumped on every invalidation so a query that started before it isn't cached
+_teacher_cache_generation = 0
+
+# One page of teachers plus the overall count, in a single round trip
+_TEACHER_PAGE_QUERY = f"""
+    SELECT {USER_RESPONSE_COLUMNS},
+           (SELECT count(*) FROM users WHERE role = 'teacher') AS total
+    FROM users
+    WHERE role = 'teacher'
+    ORDER BY last_name, id
+    LIMIT $1 OFFSET $2
+"""
+
+
+def invalidate_teacher_cache() -> None:
+    """Drop the cached teacher list (call after teachers are added or changed)"""
+    global _teacher_cache_generation
+    _teacher_cache_generation += 1
+    _teacher_cache.clear()
+
+
+async def get_all_teachers(limit: int = 50, offset: int = 0) -> TeacherListResponse:
+    """Controller to get a page of teachers, ordered by last name"""
+    cache_key = (limit, offset)
+    cached = _teacher_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    generation = _teacher_cache_generation
+    pool = get_pg_pool()
+    rows = await pool.fetch(_TEACHER_PAGE_QUERY, limit, offset)
     
     # Convert to UserResponse objects
-    teachers = []
-    for user in result.data:
-        teachers.append(UserResponse(
-            id=user["id"],
-            email=user["email"],
-            first_name=user["first_name"],
-            last_name=user["last_name"],
-            role=user["role"],
-            teacher_id=user.get("teacher_id"),
-            age=user.get("age"),
-            gender=user.get("gender"),
-            organization=user.get("organization"),
-            profile_image=user.get("profile_image"),
-            is_active=user["is_active"],
-            is_verified=user["is_verified"]
-        ))
+    teachers = [UserResponse.from_row(row) for row in rows]
+    
+    if rows:
+        total = rows[0]["total"]
+    else:
+        # Page past the end: no row to carry the count
+        total = await pool.fetchval("SELECT count(*) FROM users WHERE role = 'teacher'")
     
-    return TeacherListResponse(
+    response = TeacherListResponse(
         teachers=teachers,
-        total=len(teachers)
+        total=total
     )
+    # A teacher registered while we were querying: this page may be stale
+    if generation == _teacher_cache_generation:
+        _teacher_cache[cache_key] = response
+    
+    return response
 
 
 async def get_students_by_teacher(teacher_id: str) -> List[UserResponse]:
     """Controller to get all students for a specific teacher"""
+    pool = get_pg_pool()
+    
     # Verify teacher exists
-    teacher = supabase_admin.table("users").select("id, role").eq("id", teacher_id).execute()
+    teacher = await pool.fetchrow("SELECT id, role FROM users WHERE id = $1", teacher_id)
     
-    if not teacher.data:
+    if not teacher:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Teacher not found"
         )
     
-    if teacher.data[0]["role"] != "teacher":
+    if teacher["role"] != "teacher":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="The provided user is not a teacher"
         )
     
     # Query students for this teacher
-    result = supabase_admin.table("users").select("*").eq("teacher_id", teacher_id).execute()
+    rows = await pool.fetch(f"SELECT {USER_RESPONSE_COLUMNS} FROM users WHERE teacher_id = $1", teacher_id)
     
     # Convert to UserResponse objects
-    students = []
-    for user in result.data:
-        students.append(UserResponse(
-            id=user["id"],
-            email=user["email"],
-            first_name=user["first_name"],
-            last_name=user["last_name"],
-            role=user["role"],
-            teacher_id=user.get("teacher_id"),
-            age=user.get("age"),
-            gender=user.get("gender"),
-            organization=user.get("organization"),
-            profile_image=user.get("profile_image"),
-            is_active=user["is_active"],
-            is_verified=user["is_verified"]
-        ))
+    students = [UserResponse.from_row(row) for row in rows]
     
     return students
@@ -1,10 +1,49 @@
-from supabase import create_client, Client
+from typing import Optional
+import asyncpg
 from app.config import get_settings
 
 settings = get_settings()
 
-# Create Supabase client
-supabase: Client = create_client(settings.supabase_url, settings.supabase_key)
+# Shared asyncpg pool; every database query in the app goes through it
+pg_pool: Optional[asyncpg.Pool] = None
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Decode UUID columns as plain strings, as the response schemas expect"""
+    await conn.set_type_codec(
+        "uuid",
+        encoder=str,
+        decoder=str,
+        schema="pg_catalog",
+        format="text"
+    )
+
+
+async def init_pg_pool() -> None:
+    """Create the shared Postgres connection pool (called on startup)"""
+    global pg_pool
+    pg_pool = await asyncpg.create_pool(
+        dsn=settings.supabase_db_url,
+        min_size=5,
+        max_size=20,
+        max_inactive_connection_lifetime=300,
+        # Supavisor in transaction mode rejects named prepared statements
+        statement_cache_size=0,
+        init=_init_connection
+    )
+
+
+async def close_pg_pool() -> None:
+    """Close the shared Postgres connection pool (called on shutdown)"""
+    global pg_pool
+    if pg_pool is not None:
+        await pg_pool.close()
+        pg_pool = None
+
+
+def get_pg_pool() -> asyncpg.Pool:
+    """Get the shared Postgres connection pool"""
+    if pg_pool is None:
+        raise RuntimeError("Postgres pool is not initialized")
+    return pg_pool
 
-# Create Supabase client with service role key for admin operations
-supabase_admin: Client = create_client(settings.supabase_url, settings.supabase_service_key)
@@ -1,19 +1,44 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes.auth_routes import router as auth_router
 from app.routes.user_routes import router as user_router
 from app.routes.question_routes import router as question_router
 from app.config import get_settings
+from app.database import init_pg_pool, close_pg_pool
+from app.utils.event_buffer import start_event_worker, stop_event_worker
+from app.utils.auth import tune_password_hashing_async
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown"""
+    if settings.password_hash_target_ms:
+        time_cost = await tune_password_hashing_async(settings.password_hash_target_ms)
+        print(f"Password hashing tuned to argon2 time_cost={time_cost}")
+    await init_pg_pool()
+    await start_event_worker()
+    try:
+        yield
+    finally:
+        try:
+            await stop_event_worker()
+        finally:
+            await close_pg_pool()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="FastAPI backend with Supabase for user authentication and management",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -2,6 +2,13 @@ from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel
 
+# Columns exposed through UserResponse; select these instead of "*" so
+# password hashes and timestamps are not fetched when they are not needed
+USER_RESPONSE_COLUMNS = (
+    "id, email, first_name, last_name, role, teacher_id, age, gender, "
+    "organization, profile_image, is_active, is_verified"
+)
+
 
 class User(BaseModel):
     """User model representing database user record"""
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status, Depends
 from app.schemas.user import (
     UserRegisterRequest,
     UserLoginRequest,
@@ -9,7 +9,7 @@ from app.schemas.user import (
 )
 from app.controllers.auth_controller import register_user
 from app.controllers.login_controller import authenticate_user, request_password_reset, logout_user
-from app.utils.auth import decode_access_token
+from app.utils.auth import get_token_payload
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 
@@ -42,7 +42,7 @@ async def register(user_data: UserRegisterRequest):
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(credentials: UserLoginRequest):
+async def login(credentials: UserLoginRequest, background_tasks: BackgroundTasks):
     """
     Login user and return access token
     
@@ -50,7 +50,7 @@ async def login(credentials: UserLoginRequest):
     - **password**: User's password
     """
     try:
-        return await authenticate_user(credentials)
+        return await authenticate_user(credentials, background_tasks)
     except HTTPException:
         raise
     except Exception as e:
@@ -61,17 +61,17 @@ async def login(credentials: UserLoginRequest):
 
 
 @router.post("/forgot-password", response_model=MessageResponse)
-async def forgot_password(request: ForgotPasswordRequest):
+async def forgot_password(request: ForgotPasswordRequest, background_tasks: BackgroundTasks):
     """
     Request password reset token
     
     - **email**: User's email address
     
     Note: In a production environment, this should send an email with the reset token.
-    For now, it creates the token in the database.
+    For now, it creates the token in the database after the response is sent.
     """
     try:
-        result = await request_password_reset(request.email)
+        result = await request_password_reset(request.email, background_tasks)
         return MessageResponse(**result)
     except Exception as e:
         raise HTTPException(
@@ -81,31 +81,13 @@ async def forgot_password(request: ForgotPasswordRequest):
 
 
 @router.post("/logout", response_model=MessageResponse)
-async def logout(authorization: str = Header(None)):
+async def logout(payload: dict = Depends(get_token_payload)):
     """
     Logout user
     
     Requires Authorization header with Bearer token
     """
     try:
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Missing or invalid authorization header"
-            )
-        
-        # Extract token
-        token = authorization.replace("Bearer ", "")
-        
-        # Decode token to get user info
-        payload = decode_access_token(token)
-        
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
-        
         user_id = payload.get("sub")
         
         # Call logout controller
@@ -5,6 +5,13 @@ from app.controllers.question_controller import process_images_and_generate_ques
 
 router = APIRouter(prefix="/api/v1", tags=["Questions"])
 
+# Upload limits, so a single request can't exhaust worker memory
+MAX_IMAGES = 20
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # 10 MiB per image
+
+VALID_QUESTION_TYPES = frozenset({"multiple_choice", "short_answer", "true_false"})
+VALID_DIFFICULTIES = frozenset({"easy", "medium", "hard"})
+
 
 @router.post("/generate-questions", response_model=QuestionGenerationResponse)
 async def generate_questions(
@@ -20,7 +27,7 @@ async def generate_questions(
     """
     Generate questions from multiple images using Gemini AI
     
-    - **images**: Upload multiple images (JPEG, PNG, WEBP) - supports 5+ images
+    - **images**: Upload multiple images (JPEG, PNG, WEBP) - 2 to 20 images, up to 10 MB each
     - **subject**: Subject name for the questions
     - **num_questions**: Number of questions to generate (default: 10, max: 50)
     - **difficulty**: Question difficulty (easy, medium, hard)
@@ -47,25 +54,36 @@ async def generate_questions(
                 detail=f"At least 2 images are required. You provided {len(images)} image(s)."
             )
         
+        # Validate maximum images and image sizes before reading any of them
+        if len(images) > MAX_IMAGES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {MAX_IMAGES} images are allowed. You provided {len(images)} image(s)."
+            )
+        
+        for image in images:
+            if image.size is not None and image.size > MAX_IMAGE_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Image {image.filename} is too large. Maximum size is {MAX_IMAGE_BYTES // (1024 * 1024)} MB."
+                )
+        
         # Parse question types
         types_list = [t.strip() for t in question_types.split(",")] if question_types else None
         
         # Validate question types
-        valid_types = ["multiple_choice", "short_answer", "true_false"]
-        if types_list:
-            for qt in types_list:
-                if qt not in valid_types:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Invalid question type: {qt}. Valid types: {', '.join(valid_types)}"
-                    )
+        invalid_types = set(types_list) - VALID_QUESTION_TYPES if types_list else None
+        if invalid_types:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid question types: {', '.join(sorted(invalid_types))}. Valid types: {', '.join(sorted(VALID_QUESTION_TYPES))}"
+            )
         
         # Validate difficulty
-        valid_difficulties = ["easy", "medium", "hard"]
-        if difficulty not in valid_difficulties:
+        if difficulty not in VALID_DIFFICULTIES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid difficulty: {difficulty}. Valid values: {', '.join(valid_difficulties)}"
+                detail=f"Invalid difficulty: {difficulty}. Valid values: {', '.join(sorted(VALID_DIFFICULTIES))}"
             )
         
         # Process images and generate questions
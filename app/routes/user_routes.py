@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from typing import List
 from app.schemas.user import UserResponse, TeacherListResponse
 from app.controllers.user_controller import get_all_teachers, get_students_by_teacher
@@ -7,14 +7,20 @@ router = APIRouter(prefix="/api/v1/users", tags=["Users"])
 
 
 @router.get("/teachers", response_model=TeacherListResponse)
-async def list_teachers():
+async def list_teachers(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0)
+):
     """
-    Get list of all teachers
+    Get a page of teachers
     
-    Returns a list of all users with role 'teacher'
+    - **limit**: Maximum number of teachers to return (1-200, default 50)
+    - **offset**: Number of teachers to skip
+    
+    Returns users with role 'teacher' ordered by last name; `total` is the overall count
     """
     try:
-        return await get_all_teachers()
+        return await get_all_teachers(limit, offset)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,6 +1,12 @@
-from typing import Optional, Literal, List
+import string
+from typing import Any, Optional, Literal, List, Mapping
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
+# ASCII characters checked with a set lookup before falling back to the
+# per-character Unicode test (which also accepts e.g. "É" or "٣")
+_DIGITS = frozenset(string.digits)
+_UPPERS = frozenset(string.ascii_uppercase)
+
 
 class UserRegisterRequest(BaseModel):
     """Schema for user registration request"""
@@ -20,9 +26,9 @@ class UserRegisterRequest(BaseModel):
     def validate_password(cls, v: str) -> str:
         if len(v) < 8:
             raise ValueError('Password must be at least 8 characters long')
-        if not any(char.isdigit() for char in v):
+        if _DIGITS.isdisjoint(v) and not any(char.isdigit() for char in v):
             raise ValueError('Password must contain at least one digit')
-        if not any(char.isupper() for char in v):
+        if _UPPERS.isdisjoint(v) and not any(char.isupper() for char in v):
             raise ValueError('Password must contain at least one uppercase letter')
         return v
 
@@ -51,7 +57,19 @@ class UserResponse(BaseModel):
     profile_image: Optional[str] = None
     is_active: bool
     is_verified: bool
-    is_verified: bool
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "UserResponse":
+        """
+        Build from a users row selected by us, skipping field validation
+        
+        Required fields are read with row[field], so a query that forgets one
+        raises KeyError instead of returning a response that breaks the schema
+        """
+        return cls.model_construct(**{
+            field: row[field] if info.is_required() else row.get(field, info.default)
+            for field, info in cls.model_fields.items()
+        })
 
 
 class LoginResponse(BaseModel):
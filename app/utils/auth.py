@@ -1,18 +1,44 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Optional, Tuple
+from fastapi import Header, HTTPException, status
+from jose import jwt
 from passlib.context import CryptContext
 from app.config import get_settings
+from app.utils.auth_cache import get_cached_claims
 
 settings = get_settings()
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New hashes use argon2; existing bcrypt hashes still verify and are
+# flagged for re-hashing (see verify_and_update_password)
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=settings.argon2_time_cost,
+    argon2__memory_cost=settings.argon2_memory_cost,
+    argon2__parallelism=settings.argon2_parallelism
+)
+
+# Upper bound for auto-tuned argon2 time_cost
+MAX_ARGON2_TIME_COST = 10
+
+# Dedicated workers for password hashing, one per core. bcrypt and
+# argon2-cffi release the GIL while hashing, so threads run in parallel
+# without competing with the default threadpool used for I/O
+_hash_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="password-hash"
+)
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    # Bcrypt has a 72-byte limit, truncate if necessary
+    """Hash a password using argon2"""
+    # Keep the 72-byte truncation so passwords stay compatible with the
+    # legacy bcrypt hashes
     if len(password.encode('utf-8')) > 72:
         password = password[:72]
     return pwd_context.hash(password)
@@ -26,6 +52,65 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and re-hash it if its hash uses a deprecated scheme
+    
+    Args:
+        plain_password: Password supplied by the user
+        hashed_password: Stored password hash
+    
+    Returns:
+        Tuple of (is_valid, new_hash); new_hash is None unless the stored
+        hash should be replaced
+    """
+    # Truncate password to 72 bytes for bcrypt compatibility
+    if len(plain_password.encode('utf-8')) > 72:
+        plain_password = plain_password[:72]
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def tune_password_hashing(target_ms: int) -> int:
+    """
+    Raise argon2 time_cost until a single hash takes at least target_ms
+    
+    Args:
+        target_ms: Desired duration of one password hash on this host
+    
+    Returns:
+        The time_cost now used for new hashes
+    """
+    time_cost = settings.argon2_time_cost
+    while time_cost < MAX_ARGON2_TIME_COST:
+        started = time.perf_counter()
+        pwd_context.hash("benchmark-password")  # argon2 is the default scheme
+        if (time.perf_counter() - started) * 1000 >= target_ms:
+            break
+        time_cost += 1
+        pwd_context.update(argon2__time_cost=time_cost)
+    return time_cost
+
+
+async def tune_password_hashing_async(target_ms: int) -> int:
+    """Auto-tune argon2 on the hashing executor (called on startup)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, tune_password_hashing, target_ms)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify (and possibly re-hash) a password on the hashing executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, verify_and_update_password, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -50,18 +135,44 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[dict]:
+async def decode_access_token(token: str) -> Optional[dict]:
     """
     Decode and verify a JWT access token
     
+    Verifications are cached for a few seconds (see app.utils.auth_cache),
+    so repeated calls with the same token skip the signature check
+    
     Args:
         token: JWT token string to decode
     
     Returns:
         Decoded token data or None if invalid
     """
-    try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        return payload
-    except JWTError:
-        return None
+    return await get_cached_claims(token)
+
+
+async def get_token_payload(authorization: str = Header(None)) -> dict:
+    """
+    FastAPI dependency that reads the Authorization: Bearer header
+
+    Returns:
+        Decoded token data
+    """
+    # Split off the scheme in one pass; a "Bearer " inside the token is left alone
+    scheme, _, token = (authorization or "").partition(" ")
+    
+    if scheme != "Bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid authorization header"
+        )
+    
+    payload = await decode_access_token(token)
+    
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+    
+    return payload
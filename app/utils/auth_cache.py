@@ -0,0 +1,52 @@
+import hashlib
+import time
+from typing import Optional
+from cachetools import TTLCache
+from jose import JWTError, jwt
+from app.config import get_settings
+
+settings = get_settings()
+
+# Decoded claims are kept for a few seconds only, so a revoked or expired
+# token never outlives its cache entry by more than this window
+CLAIMS_CACHE_TTL_SECONDS = 10
+
+# Only touched from the event loop (never from worker threads), so no lock is needed
+_claims_cache: TTLCache = TTLCache(maxsize=10000, ttl=CLAIMS_CACHE_TTL_SECONDS)
+
+
+def _token_key(token: str) -> bytes:
+    """Cache key for a token (raw tokens are never stored)"""
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+
+async def get_cached_claims(token: str) -> Optional[dict]:
+    """
+    Decode and verify a JWT access token, reusing recent verifications
+
+    Args:
+        token: JWT token string to decode
+
+    Returns:
+        Decoded token data or None if invalid
+    """
+    key = _token_key(token)
+    now = time.time()
+
+    entry = _claims_cache.get(key)
+
+    if entry is not None:
+        claims, valid_until = entry
+        if now < valid_until:
+            return claims
+
+    try:
+        claims = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        return None
+
+    # Never serve cached claims past the token's own expiry
+    valid_until = min(claims.get("exp", now), now + CLAIMS_CACHE_TTL_SECONDS)
+    _claims_cache[key] = (claims, valid_until)
+
+    return claims
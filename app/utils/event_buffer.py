@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Optional
+from app.database import get_pg_pool
+
+# Rows waiting to be written, per buffer; new rows are dropped when full
+MAX_QUEUED_EVENTS = 10000
+
+# Flush when this many rows are buffered or the oldest is this old
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class _WriteBuffer:
+    """Queue of rows for one INSERT statement, written in batches by a background task"""
+
+    def __init__(self, name: str, insert_sql: str):
+        self.name = name
+        self.insert_sql = insert_sql
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUED_EVENTS)
+        self.task: Optional[asyncio.Task] = None
+
+    def submit(self, row: tuple) -> None:
+        """Queue a row without waiting for the database"""
+        try:
+            self.queue.put_nowait(row)
+        except asyncio.QueueFull:
+            # Don't fail the request if writing falls behind, but leave a trace
+            print(f"Dropped 1 {self.name} row: write queue is full")
+
+    async def _flush(self, batch: List[tuple]) -> None:
+        """Write a batch of rows in a single statement, falling back to one row at a time"""
+        pool = get_pg_pool()
+        try:
+            await pool.executemany(self.insert_sql, batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                print(f"Failed to write 1 {self.name} row: {e}")
+                return
+            # executemany is all-or-nothing; retry so one bad row (e.g. a
+            # deleted user's foreign key) only loses itself
+            print(f"Batch of {len(batch)} {self.name} failed, retrying row by row: {e}")
+
+        try:
+            async with pool.acquire() as conn:
+                for row in batch:
+                    try:
+                        await conn.execute(self.insert_sql, *row)
+                    except Exception as e:
+                        print(f"Failed to write 1 {self.name} row: {e}")
+        except Exception as e:
+            # Database unreachable: drop this batch but keep the worker alive
+            print(f"Failed to write {len(batch)} {self.name}: {e}")
+
+    async def _safe_flush(self, batch: List[tuple]) -> None:
+        """Flush without letting an unexpected error end the worker"""
+        try:
+            await self._flush(batch)
+        except Exception as e:
+            print(f"Unexpected error writing {len(batch)} {self.name}: {e}")
+
+    def _drain(self, batch: List[tuple]) -> None:
+        """Move already-queued rows into the batch without waiting"""
+        while len(batch) < FLUSH_BATCH_SIZE and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+
+    async def _worker(self) -> None:
+        """Collect queued rows and flush them in batches"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + FLUSH_INTERVAL_SECONDS
+
+            try:
+                while len(batch) < FLUSH_BATCH_SIZE:
+                    self._drain(batch)
+                    remaining = deadline - loop.time()
+                    if len(batch) >= FLUSH_BATCH_SIZE or remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Shutting down: write what was collected before stopping
+                await self._safe_flush(batch)
+                raise
+
+            await self._safe_flush(batch)
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+        while not self.queue.empty():
+            batch: List[tuple] = []
+            self._drain(batch)
+            await self._safe_flush(batch)
+
+
+_login_events = _WriteBuffer(
+    "login events",
+    "INSERT INTO login_history (user_id, success, login_at) VALUES ($1, $2, $3)"
+)
+_reset_tokens = _WriteBuffer(
+    "password reset tokens",
+    "INSERT INTO password_reset_tokens (user_id, token, expires_at) VALUES ($1, $2, $3)"
+)
+_BUFFERS = (_login_events, _reset_tokens)
+
+
+def record_login_event(user_id: str, success: bool = True) -> None:
+    """Queue a login_history row without waiting for the database"""
+    _login_events.submit((user_id, success, datetime.now(timezone.utc)))
+
+
+def record_reset_token(user_id: str, token: str, expires_at: datetime) -> None:
+    """Queue a password_reset_tokens row without waiting for the database"""
+    _reset_tokens.submit((user_id, token, expires_at))
+
+
+async def start_event_worker() -> None:
+    """Start the background flush tasks (called on startup)"""
+    for buffer in _BUFFERS:
+        buffer.start()
+
+
+async def stop_event_worker() -> None:
+    """Stop the background flush tasks and write pending rows (called on shutdown)"""
+    for buffer in _BUFFERS:
+        # One buffer failing to stop must not leave the others undrained
+        try:
+            await buffer.stop()
+        except Exception as e:
+            print(f"Failed to stop {buffer.name} writer: {e}")
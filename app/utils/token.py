@@ -1,17 +1,38 @@
+import base64
+import os
 import secrets
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# Random bytes per reset token (same as secrets.token_urlsafe(32))
+RESET_TOKEN_BYTES = 32
 
 
 def generate_reset_token() -> str:
     """Generate a secure random token for password reset"""
-    return secrets.token_urlsafe(32)
+    return secrets.token_urlsafe(RESET_TOKEN_BYTES)
+
+
+def generate_reset_tokens(n: int) -> List[str]:
+    """
+    Generate many password reset tokens at once (e.g. for bulk resets)
+    
+    Reads all the randomness with a single os.urandom call; each token has
+    the same format and strength as generate_reset_token()
+    """
+    buf = os.urandom(RESET_TOKEN_BYTES * n)
+    return [
+        base64.urlsafe_b64encode(buf[i:i + RESET_TOKEN_BYTES]).rstrip(b"=").decode("ascii")
+        for i in range(0, len(buf), RESET_TOKEN_BYTES)
+    ]
 
 
 def is_token_expired(expires_at: datetime) -> bool:
-    """Check if a token has expired"""
-    return datetime.utcnow() > expires_at
+    """Check if a token has expired (expires_at must be timezone-aware)"""
+    return time.time() > expires_at.timestamp()
 
 
 def get_token_expiry(hours: int = 24) -> datetime:
-    """Get expiry datetime for a token (default 24 hours)"""
-    return datetime.utcnow() + timedelta(hours=hours)
+    """Get timezone-aware (UTC) expiry datetime for a token (default 24 hours)"""
+    return datetime.now(timezone.utc) + timedelta(hours=hours)
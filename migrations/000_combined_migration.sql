@@ -111,6 +111,46 @@ CREATE INDEX IF NOT EXISTS idx_login_history_login_at ON login_history(login_at)
 -- Add comment to table
 COMMENT ON TABLE login_history IS 'Tracks user login attempts and history';
 
+-- ============================================
+-- Migration 007: Enforce that teacher_id references a teacher
+-- ============================================
+
+-- teacher_id already references users(id), so a missing teacher fails the
+-- foreign key; this trigger rejects references to users who are not teachers
+CREATE OR REPLACE FUNCTION check_teacher_role()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.teacher_id IS NOT NULL AND EXISTS (
+        SELECT 1 FROM users WHERE id = NEW.teacher_id AND role <> 'teacher'
+    ) THEN
+        RAISE EXCEPTION 'User % is not a teacher', NEW.teacher_id
+            USING ERRCODE = 'check_violation',
+                  CONSTRAINT = 'teacher_must_be_teacher';
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Create trigger to validate teacher_id on insert and update
+DROP TRIGGER IF EXISTS teacher_must_be_teacher ON users;
+CREATE TRIGGER teacher_must_be_teacher
+    BEFORE INSERT OR UPDATE OF teacher_id ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION check_teacher_role();
+
+-- ============================================
+-- Migration 008: Add covering index for paged teacher listings
+-- ============================================
+
+-- Ordered by (last_name, id) so LIMIT/OFFSET pages are stable. profile_image is
+-- left out of INCLUDE: it is unbounded TEXT and could exceed the btree row size
+-- limit, so listing a page still reads that one column from the table
+CREATE INDEX IF NOT EXISTS idx_users_teachers_listing ON users (last_name, id)
+    INCLUDE (email, first_name, teacher_id, age, gender, organization, is_active, is_verified)
+    WHERE role = 'teacher';
+
+-- Migration 006 is not included: its index is superseded by the one above
+
 -- ============================================
 -- Migration Complete
 -- ============================================
@@ -0,0 +1,9 @@
+-- Migration: Add partial index for teacher lookups
+-- Description: Speeds up teacher listings and teacher-by-id checks
+-- Date: 2026-10-14
+
+-- Partial index covering only teachers, used by role = 'teacher' queries
+CREATE INDEX IF NOT EXISTS idx_users_role_teacher ON users(id) WHERE role = 'teacher';
+
+-- Note: email lookups are already served by the UNIQUE(email) index and
+-- teacher_id lookups by idx_users_teacher_id
@@ -0,0 +1,26 @@
+-- Migration: Enforce that teacher_id references a teacher
+-- Description: Moves the "is this user a teacher?" check into the database
+-- Date: 2026-10-14
+
+-- teacher_id already references users(id), so a missing teacher fails the
+-- foreign key; this trigger rejects references to users who are not teachers
+CREATE OR REPLACE FUNCTION check_teacher_role()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.teacher_id IS NOT NULL AND EXISTS (
+        SELECT 1 FROM users WHERE id = NEW.teacher_id AND role <> 'teacher'
+    ) THEN
+        RAISE EXCEPTION 'User % is not a teacher', NEW.teacher_id
+            USING ERRCODE = 'check_violation',
+                  CONSTRAINT = 'teacher_must_be_teacher';
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Create trigger to validate teacher_id on insert and update
+DROP TRIGGER IF EXISTS teacher_must_be_teacher ON users;
+CREATE TRIGGER teacher_must_be_teacher
+    BEFORE INSERT OR UPDATE OF teacher_id ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION check_teacher_role();
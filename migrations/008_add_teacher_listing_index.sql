@@ -0,0 +1,14 @@
+-- Migration: Add covering index for paged teacher listings
+-- Description: Serves GET /users/teachers pages in last_name order and the teacher count from one partial index
+-- Date: 2026-10-14
+
+-- Ordered by (last_name, id) so LIMIT/OFFSET pages are stable. profile_image is
+-- left out of INCLUDE: it is unbounded TEXT and could exceed the btree row size
+-- limit, so listing a page still reads that one column from the table
+CREATE INDEX IF NOT EXISTS idx_users_teachers_listing ON users (last_name, id)
+    INCLUDE (email, first_name, teacher_id, age, gender, organization, is_active, is_verified)
+    WHERE role = 'teacher';
+
+-- Supersedes 006: the listing and count(*) now use the index above, and
+-- teacher-by-id checks are served by the primary key
+DROP INDEX IF EXISTS idx_users_role_teacher;